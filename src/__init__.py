@@ -7,20 +7,26 @@ Provides utilities for working with the Rossum API, including:
 - Utilities for configuration and helper functions
 """
 
-# Import main components for easy access
-from utils import (
-    API_TOKEN,
-    API_BASE_URL,
-    create_api_client,
-)
+import importlib
 
-from lib.deploy import (
-    deploy_function_with_sdk,
-)
+# Components are imported on first access (PEP 562), so importing the package
+# doesn't pull in the Rossum SDK until a client or deploy symbol is used
+_LAZY_IMPORTS = {
+    'API_TOKEN': 'utils',
+    'API_BASE_URL': 'utils',
+    'create_api_client': 'utils',
+    'deploy_function_with_sdk': 'lib.deploy',
+    'deploy_functions_with_sdk': 'lib.deploy',
+    'test_hook': 'lib.trigger',
+}
 
-from lib.trigger import (
-    test_hook,
-)
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
 
 __all__ = [
     # Configuration
@@ -32,6 +38,7 @@ __all__ = [
     
     # Deployment
     'deploy_function_with_sdk',
+    'deploy_functions_with_sdk',
     
     # Triggering
     'test_hook',
@@ -5,10 +5,12 @@ Provides utilities for deploying serverless functions to Rossum.
 
 from .deploy_with_sdk import (
     deploy_function_with_sdk,
+    deploy_functions_with_sdk,
     read_function_file,
 )
 
 __all__ = [
     'deploy_function_with_sdk',
+    'deploy_functions_with_sdk',
     'read_function_file',
 ]
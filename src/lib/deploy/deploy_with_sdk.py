@@ -5,20 +5,110 @@ This script creates or updates a hook in Rossum with the function code.
 """
 
 import argparse
+import functools
+import glob
+import hashlib
 import logging
+import mmap
 import os
+import re
 import sys
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from typing import Dict, Any, Optional, List
 
-# Add the src directory to the path to make imports work properly
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+try:
+    import fcntl
+except ImportError:  # Windows - fall back to the in-process lock only
+    fcntl = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Configure logging - timestamps are only added in verbose mode
+VERBOSE_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
+
+# Local record of the last successful deploy per API URL and function name
+DEPLOY_CACHE_PATH = Path('.') / '.rossum-deploy-cache.json'
+_deploy_cache_lock = threading.Lock()
+
+# Function files larger than this are memory-mapped when read
+MMAP_THRESHOLD = 64 * 1024
+
+# Any whitespace run containing a newline - collapsing these to a single newline
+# strips every line and drops blank lines in one pass
+_WS_COLLAPSE = re.compile(r'\s*\n\s*')
+
+# Entry point every deployed function must define
+HANDLER_NAME = "rossum_hook_request_handler"
+
+# Serverless runtime the functions are deployed to
+HOOK_RUNTIME = "python3.12"
+
+# Static parts of the hook payload, shared read-only between deploys
+_HOOK_CONFIG_TEMPLATE = MappingProxyType({
+    "url": "https://dummy-url.com",  # Required field but not used for serverless functions
+    "runtime": HOOK_RUNTIME,  # Required runtime field
+    "timeout_s": 30,  # Add a reasonable timeout
+    "retry_count": 3,  # Add retry count for reliability
+})
+_HOOK_TEMPLATE = MappingProxyType({
+    "type": "function",
+    "active": True,
+    "queues": (),  # Required field
+})
  
 
+def _canonical_digest(code: str) -> bytes:
+    """
+    Compute a SHA-256 digest of the code, ignoring surrounding whitespace and blank lines.
+    
+    Args:
+        code: The function code to hash
+        
+    Returns:
+        bytes: The 32-byte digest
+    """
+    return hashlib.sha256(_WS_COLLAPSE.sub("\n", code).strip().encode()).digest()
+
+def _load_deploy_cache() -> Dict[str, Any]:
+    """Load the local deploy cache, returning an empty dict if it is missing or invalid."""
+    try:
+        with open(DEPLOY_CACHE_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _record_deploy(cache_key: str, fingerprint: str, hook_dict: Dict[str, Any]) -> None:
+    """Record a successful deploy, merging with entries written by concurrent deploys."""
+    with _deploy_cache_lock:
+        try:
+            with open(DEPLOY_CACHE_PATH, "a+") as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    cache = json.loads(f.read() or "{}")
+                except ValueError:
+                    cache = {}
+                cache[cache_key] = {"fingerprint": fingerprint, "hook": hook_dict}
+                f.seek(0)
+                f.truncate()
+                json.dump(cache, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not write deploy cache: {e}")
+
+# Ways the code can be stored on a hook object, tried in order
+_CODE_EXTRACTORS = (
+    lambda h: h.function.code,
+    lambda h: h.code,
+    lambda h: h.function['code'],
+    lambda h: h['function']['code'],
+    lambda h: h['code'],
+)
+
 def get_hook_code(hook_obj):
     """
     Safely extract code from a hook object regardless of its structure.
@@ -27,61 +117,111 @@ def get_hook_code(hook_obj):
         hook_obj: The hook object to extract code from
         
     Returns:
-        str: The extracted code or a message indicating code was not found
+        str: The extracted code or None if code was not found
     """
-    # Try different possible structures
-    if hasattr(hook_obj, 'function') and hasattr(hook_obj.function, 'code'):
-        return hook_obj.function.code
-    elif hasattr(hook_obj, 'code'):
-        return hook_obj.code
-    elif hasattr(hook_obj, 'function') and isinstance(hook_obj.function, dict) and 'code' in hook_obj.function:
-        return hook_obj.function['code']
-    elif isinstance(hook_obj, dict) and 'function' in hook_obj and 'code' in hook_obj['function']:
-        return hook_obj['function']['code']
-    elif isinstance(hook_obj, dict) and 'code' in hook_obj:
-        return hook_obj['code']
+    for extractor in _CODE_EXTRACTORS:
+        try:
+            return extractor(hook_obj)
+        except (AttributeError, KeyError, TypeError):
+            continue
     
     # If we get here, we couldn't find the code
     return None
 
+def _get(obj, key):
+    """Read a field from an SDK object or a plain dict, returning None if it is missing."""
+    try:
+        return getattr(obj, key)
+    except AttributeError:
+        return obj.get(key) if isinstance(obj, dict) else None
+
+def _as_hook_view(hook) -> SimpleNamespace:
+    """
+    Normalize an SDK hook object or hook dict into the fields used during deployment.
+    
+    Args:
+        hook: The hook object or dict
+        
+    Returns:
+        SimpleNamespace: Namespace with id, events, queues, token_owner and code attributes
+    """
+    return SimpleNamespace(
+        id=_get(hook, 'id'),
+        events=_get(hook, 'events'),
+        queues=_get(hook, 'queues'),
+        token_owner=_get(hook, 'token_owner'),
+        code=get_hook_code(hook),
+    )
+
+def _hook_summary(hook) -> Dict[str, Any]:
+    """Summarize a hook object or dict into the fields returned from a deploy."""
+    return {key: _get(hook, key) for key in ("id", "name", "url", "active", "type")}
+
+def _without_code(hook_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a shallow copy of hook data with config.code replaced by its length, for logging."""
+    config = hook_data.get("config")
+    if not isinstance(config, dict) or "code" not in config:
+        return hook_data
+    return {**hook_data, "config": {**config, "code": f"<{len(config['code'])} characters>"}}
+
+def _diff_dict(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the items of new whose values differ from old."""
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+def _queue_ids(queues) -> Optional[List[Any]]:
+    """Normalize queue references (IDs or API URLs like .../queues/123) to integer IDs where possible."""
+    if not queues:
+        return queues
+    ids = []
+    for queue in queues:
+        tail = str(queue).rstrip("/").rsplit("/", 1)[-1]
+        ids.append(int(tail) if tail.isdigit() else queue)
+    return ids
+
+@functools.lru_cache(maxsize=32)
+def _read_function_file_cached(file_path: str, mtime_ns: int, size: int) -> str:
+    """Read a function file; cached per (path, mtime, size) so unchanged files are read once."""
+    if size > MMAP_THRESHOLD:
+        # Map large files instead of copying them through the text read buffer
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Fail fast on the raw bytes before paying for the decode
+            if mm.find(HANDLER_NAME.encode()) < 0:
+                raise ValueError(f"Function code must include a '{HANDLER_NAME}' function")
+            return mm[:].decode("utf-8")
+    # newline='' skips universal-newline translation, matching the mmap path
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
 def read_function_file(file_path: str) -> str:
     """Read the function code from a file."""
     try:
-        with open(file_path, "r") as f:
-            return f.read()
+        st = os.stat(file_path)
+        return _read_function_file_cached(file_path, st.st_mtime_ns, st.st_size)
+    except UnicodeDecodeError as e:
+        logger.error(f"Error reading function file: {e}")
+    except ValueError as e:
+        # Mapped files are checked for the handler before decoding - report it
+        # the same way deploy_function_with_sdk does for smaller files
+        logger.error(f"Error: {e}")
     except Exception as e:
         logger.error(f"Error reading function file: {e}")
-        return None
+    return None
 
-def should_update_function(existing_hook, new_function_code: str, client) -> bool:
+def should_update_function(hook_detail, new_function_code: str, new_code_digest: Optional[bytes] = None) -> bool:
     """
     Determine if a function needs to be updated by checking if the code has changed.
     
     Args:
-        existing_hook: The existing hook object
+        hook_detail: The already retrieved hook detail object (None if it could not be retrieved)
         new_function_code: The new function code to compare with
-        client: Authenticated ElisAPIClientSync client
+        new_code_digest: Precomputed canonical digest of new_function_code
         
     Returns:
         bool: True if the function needs updating, False otherwise
     """
     try:
-        # Get hook ID safely, handling different object types
-        hook_id = None
-        if hasattr(existing_hook, 'id'):
-            hook_id = existing_hook.id
-        elif isinstance(existing_hook, dict) and 'id' in existing_hook:
-            hook_id = existing_hook['id']
-        
-        if not hook_id:
-            logger.warning("Could not determine hook ID, assuming update is needed")
-            return True
-            
-        # Get detailed hook information including function code if possible
-        try:
-            hook_detail = client.retrieve_hook(hook_id)
-        except Exception as e:
-            logger.warning(f"Could not retrieve hook details: {str(e)}. Assuming update is needed.")
+        if hook_detail is None:
+            logger.warning("Hook details not available, assuming update is needed")
             return True
             
         existing_code = get_hook_code(hook_detail)
@@ -91,11 +231,16 @@ def should_update_function(existing_hook, new_function_code: str, client) -> boo
             logger.warning("Could not retrieve existing function code for comparison, assuming update is needed")
             return True
             
-        # Compare code content (ignoring whitespace differences)
-        existing_code_normalized = "\n".join(line.strip() for line in existing_code.splitlines() if line.strip())
-        new_code_normalized = "\n".join(line.strip() for line in new_function_code.splitlines() if line.strip())
+        # Byte-identical code needs no normalization at all
+        if existing_code == new_function_code:
+            logger.info("Function code is identical - no update needed")
+            return False
         
-        if existing_code_normalized != new_code_normalized:
+        # Compare code digests (ignoring whitespace differences)
+        if new_code_digest is None:
+            new_code_digest = _canonical_digest(new_function_code)
+        
+        if _canonical_digest(existing_code) != new_code_digest:
             logger.info("Function code has changed - update is needed")
             return True
         else:
@@ -114,6 +259,8 @@ def deploy_function_with_sdk(
     token_owner: Optional[str] = None,
     events: List[str] = None,
     force_update: bool = False,
+    verify: bool = False,
+    base_url: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Deploy a serverless function to Rossum using the SDK.
@@ -126,40 +273,63 @@ def deploy_function_with_sdk(
         token_owner: Optional token owner URL (format: https://example.rossum.app/api/v1/users/123)
         events: List of event types to trigger the function (default: ["invocation.manual"])
         force_update: Force update even if no code changes are detected
+        verify: Retrieve the hook again after deploying to confirm it exists
+        base_url: API base URL the client was created with, used to key the local
+            deploy cache (falls back to client.url; the cache is skipped if neither is known)
         
     Returns:
         The created or updated hook data
     """
     try:
         # Validate that the function includes the required handler function
-        if "rossum_hook_request_handler" not in function_code:
-            logger.error("Error: Function code must include a 'rossum_hook_request_handler' function")
+        if HANDLER_NAME not in function_code:
+            logger.error("Error: Function code must include a '%s' function", HANDLER_NAME)
             return None
         
+        # The local code never changes during a deploy, so hash it once
+        code_digest = _canonical_digest(function_code)
+        
+        # Hook settings explicitly requested besides the code, compared against the
+        # existing hook. Defaulted events are not a request to change the hook
+        requested_metadata = {}
+        if events:
+            requested_metadata["events"] = events
+        if queue_id:
+            requested_metadata["queues"] = [queue_id]
+        if token_owner:
+            requested_metadata["token_owner"] = token_owner
+        
         # Use default events if none provided
         if not events:
             events = ["invocation.manual"]
         
+        # Cache fingerprint covers the exact code bytes and the requested settings. The
+        # canonical digest can't be used here: it ignores indentation, which changes
+        # what Python code does
+        fingerprint = hashlib.sha256(function_code.encode() + repr(sorted(requested_metadata.items())).encode()).hexdigest()
+        
+        # Nothing to do if this exact code and settings were the last successful deploy.
+        # The cache is keyed per environment, so without a known API URL it isn't used
+        api_url = base_url or getattr(client, 'url', None)
+        cache_key = f"{api_url.rstrip('/')}|{function_name}" if isinstance(api_url, str) and api_url else None
+        cached = _load_deploy_cache().get(cache_key) if cache_key else None
+        if not force_update and isinstance(cached, dict) and cached.get("fingerprint") == fingerprint:
+            print(f"No changes since last successful deploy of '{function_name}', skipping.")
+            return cached["hook"]
+        
         # Prepare hook data with function code correctly included
         hook_data = {
+            **_HOOK_TEMPLATE,
             "name": function_name,
-            "type": "function",
-            "active": True,
-            "config": {
-                "url": "https://dummy-url.com",  # Required field but not used for serverless functions
-                "runtime": "python3.12",  # Required runtime field
-                "code": function_code,  # Code should be in config.code for hooks of type "function"
-                "timeout_s": 30,  # Add a reasonable timeout
-                "retry_count": 3  # Add retry count for reliability
-            },
+            # Code should be in config.code for hooks of type "function"
+            "config": {**_HOOK_CONFIG_TEMPLATE, "code": function_code},
             "events": events,  # Use provided events
-            "queues": []  # Required field
         }
         
         # Add token_owner if provided
         if token_owner:
             hook_data["token_owner"] = token_owner
-            logger.info(f"Setting token_owner to: {token_owner}")
+            logger.info("Setting token_owner to: %s", token_owner)
         
         # Note: The Rossum API doesn't return the function code in API responses
         # for security and performance reasons. The code is still saved on the server.
@@ -167,145 +337,150 @@ def deploy_function_with_sdk(
         # but it will execute properly when triggered.
         
         # Basic logging of function details
-        logger.info(f"Function code length: {len(function_code)} characters")
-        logger.info(f"Function code preview (first 100 chars): {function_code[:100]}...")
+        logger.info("Function code length: %d characters", len(function_code))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Function code preview (first 100 chars): %s...", function_code[:100])
         
         # Add queue if specified
         if queue_id:
             hook_data["queues"] = [queue_id]
         
-        # Check if hook already exists
-        existing_hook = None
-        logger.info("Checking for existing hooks...")
-        for hook in client.list_all_hooks(name=function_name):
-            existing_hook = hook
-            break
+        # Check if hook already exists - only the first match is used, so ask the API for a single-item page
+        logger.info("Checking for existing hook '%s'", function_name)
+        existing_hook = next(iter(client.list_all_hooks(name=function_name, page_size=1)), None)
         
         if existing_hook:
+            # Normalize the hook once instead of probing attributes/keys at every use
+            existing = _as_hook_view(existing_hook)
+            
             # Update existing hook
-            logger.info(f"Updating existing hook '{function_name}' with ID {existing_hook.id}")
+            logger.info("Updating existing hook '%s' with ID %s", function_name, existing.id)
+            
+            # Retrieve the hook details once - reused for the code comparison
+            # and for preserving events/queues below
+            try:
+                detail = _as_hook_view(client.retrieve_hook(existing.id))
+            except Exception as e:
+                logger.warning("Could not retrieve hook details: %s", e)
+                detail = None
             
             # Check if the function code has actually changed
-            update_needed = should_update_function(existing_hook, function_code, client)
+            update_needed = should_update_function(detail, function_code, code_digest)
             
             if not update_needed and not force_update:
-                logger.info("No code changes detected and force_update not specified. Skipping update.")
-                return existing_hook
-                
-            # IMPORTANT: For updating hooks, we need to explicitly include the function code
-            # Otherwise, the API might ignore the code update
-            updated_hook_data = {
-                "config": {
-                    "code": function_code,  # Code should be in config.code for hooks of type "function"
-                    "runtime": "python3.12",
-                    "timeout_s": 30,
-                    "retry_count": 3
+                # Code is unchanged - only send the requested metadata fields that actually
+                # differ. The API returns queues as URLs, so compare them as IDs
+                current = {**vars(detail), "queues": _queue_ids(detail.queues)}
+                updated_hook_data = _diff_dict(current, requested_metadata)
+                if not updated_hook_data:
+                    if cache_key:
+                        _record_deploy(cache_key, fingerprint, _hook_summary(existing_hook))
+                    logger.info("No code changes detected and force_update not specified. Skipping update.")
+                    return existing_hook
+                logger.info("Function code unchanged, updating metadata only: %s", ", ".join(updated_hook_data))
+            else:
+                # IMPORTANT: For updating hooks, we need to explicitly include the function code
+                # Otherwise, the API might ignore the code update
+                updated_hook_data = {
+                    "config": {**_HOOK_CONFIG_TEMPLATE, "code": function_code},
                 }
-            }
             
-            # Keep important fields like events if they exist in the current hook configuration
-            try:
-                # Get full details of the existing hook
-                existing_hook_detail = client.retrieve_hook(existing_hook.id)
-                
-                # Preserve existing events if they're set and not being explicitly updated
-                if hasattr(existing_hook_detail, 'events') and existing_hook_detail.events and not events:
-                    updated_hook_data["events"] = existing_hook_detail.events
-                    logger.info(f"Preserving existing events: {updated_hook_data['events']}")
-                else:
-                    updated_hook_data["events"] = events
-                    logger.info(f"Setting events to: {events}")
+                # Keep important fields like events if they exist in the current hook configuration
+                try:
+                    if detail is None:
+                        raise ValueError("hook details were not retrieved")
                 
-                # Include other required fields
-                updated_hook_data["type"] = "function"
-                updated_hook_data["active"] = True
-                updated_hook_data["name"] = function_name
+                    # Preserve existing events if they're set and not being explicitly updated
+                    if detail.events and not events:
+                        updated_hook_data["events"] = detail.events
+                        logger.info("Preserving existing events: %s", updated_hook_data['events'])
+                    else:
+                        updated_hook_data["events"] = events
+                        logger.info("Setting events to: %s", events)
                 
-                # Add config if it doesn't exist in the update data
-                if "config" not in updated_hook_data:
-                    updated_hook_data["config"] = {
-                        "url": "https://dummy-url.com",
-                        "runtime": "python3.12"
-                    }
+                    # Include other required fields
+                    updated_hook_data["type"] = "function"
+                    updated_hook_data["active"] = True
+                    updated_hook_data["name"] = function_name
                 
-                # Add token_owner if provided
-                if token_owner:
-                    updated_hook_data["token_owner"] = token_owner
+                    # Add token_owner if provided
+                    if token_owner:
+                        updated_hook_data["token_owner"] = token_owner
                 
-                # Add queue if specified
-                if queue_id:
-                    updated_hook_data["queues"] = [queue_id]
-                elif hasattr(existing_hook_detail, 'queues') and existing_hook_detail.queues:
-                    updated_hook_data["queues"] = existing_hook_detail.queues
-                else:
-                    updated_hook_data["queues"] = []
+                    # Add queue if specified
+                    if queue_id:
+                        updated_hook_data["queues"] = [queue_id]
+                    elif detail.queues:
+                        updated_hook_data["queues"] = detail.queues
+                    else:
+                        updated_hook_data["queues"] = []
                     
-            except Exception as e:
-                logger.warning(f"Could not retrieve full details of existing hook: {str(e)}")
-                # Fall back to using the original hook_data
-                updated_hook_data = hook_data
+                except Exception as e:
+                    logger.warning("Could not retrieve full details of existing hook: %s", e)
+                    # Fall back to sending just the code and the requested settings
+                    updated_hook_data = {
+                        "config": {**_HOOK_CONFIG_TEMPLATE, "code": function_code},
+                        "events": list(events),
+                    }
+                    if token_owner:
+                        updated_hook_data["token_owner"] = token_owner
+                    if queue_id:
+                        updated_hook_data["queues"] = [queue_id]
             
             # Log the update operation
             logger.info("Updating hook with the following data:")
-            logger.info(f"- Name: {updated_hook_data.get('name', 'unchanged')}")
-            logger.info(f"- Function code length: {len(function_code)} characters")
-            logger.info(f"- Events: {updated_hook_data.get('events', 'unchanged')}")
-            logger.info(f"- Queues: {updated_hook_data.get('queues', 'unchanged')}")
+            logger.info("- Name: %s", updated_hook_data.get('name', 'unchanged'))
+            logger.info("- Events: %s", updated_hook_data.get('events', 'unchanged'))
+            logger.info("- Queues: %s", updated_hook_data.get('queues', 'unchanged'))
             
             # Debug the actual data we're sending
-            logger.debug(f"Update data structure: {json.dumps(updated_hook_data, indent=2, default=str)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Update data structure: %s", json.dumps(_without_code(updated_hook_data), indent=2, default=str))
             
             try:
-                # Get hook ID safely
-                hook_id = None
-                if hasattr(existing_hook, 'id'):
-                    hook_id = existing_hook.id
-                elif isinstance(existing_hook, dict) and 'id' in existing_hook:
-                    hook_id = existing_hook['id']
-                
-                if not hook_id:
+                if not existing.id:
                     logger.error("Cannot update hook: missing ID")
                     raise ValueError("Hook ID not found in existing hook object")
                 
                 # Attempt the update
-                result = client.update_part_hook(hook_id, data=updated_hook_data)
+                result = client.update_part_hook(existing.id, data=updated_hook_data)
                 operation = "updated"
-                logger.debug(f"Update result: {result}")
+                logger.debug("Update result: %s", result)
             except Exception as e:
-                logger.error(f"Failed to update hook: {str(e)}")
+                logger.error("Failed to update hook: %s", e)
                 # Try to fetch the hook to see if it actually changed despite the error
                 try:
-                    updated_hook = client.retrieve_hook(existing_hook.id)
-                    logger.debug(f"Hook after update attempt: {updated_hook}")
+                    updated_hook = client.retrieve_hook(existing.id)
+                    logger.debug("Hook after update attempt: %s", updated_hook)
                 except Exception as inner_e:
-                    logger.error(f"Failed to retrieve hook after update attempt: {str(inner_e)}")
+                    logger.error("Failed to retrieve hook after update attempt: %s", inner_e)
                 raise e
         else:
             # Create new hook
-            logger.info(f"Creating new hook '{function_name}'")
+            logger.info("Creating new hook '%s'", function_name)
             result = client.create_new_hook(data=hook_data)
             operation = "created"
         
-        logger.info(f"Successfully {operation} hook '{function_name}' with ID {result.id}")
+        logger.info("Successfully %s hook '%s' with ID %s", operation, function_name, result.id)
         
-        # Double-check by retrieving the hook directly
-        try:
-            retrieved_hook = client.retrieve_hook(result.id)
-            logger.info(f"Retrieved hook after {operation}: ID {retrieved_hook.id}")
-            logger.info("The function code was deployed successfully")
-            logger.info(f"To test the function, use the trigger tool: rye run trigger {result.id}")
-                
-        except Exception as e:
-            logger.warning(f"Could not retrieve hook for verification: {str(e)}")
+        # Double-check by retrieving the hook directly - an extra round trip,
+        # so only done on request or when debugging
+        if verify or logger.isEnabledFor(logging.DEBUG):
+            try:
+                retrieved_hook = client.retrieve_hook(result.id)
+                logger.info("Retrieved hook after %s: ID %s", operation, retrieved_hook.id)
+            except Exception as e:
+                logger.warning("Could not retrieve hook for verification: %s", e)
+        
+        logger.info("The function code was deployed successfully")
+        logger.info("To test the function, use the trigger tool: rye run trigger %s", result.id)
         
         # Return result as dictionary
-        hook_dict = {
-            "id": result.id,
-            "name": result.name,
-            "url": result.url,
-            "active": result.active,
-            "type": result.type,
-        }
+        hook_dict = _hook_summary(result)
+        
+        # Remember what was deployed so unchanged re-deploys can skip the network entirely
+        if cache_key:
+            _record_deploy(cache_key, fingerprint, hook_dict)
         
         # Print success message
         print(f"\nFunction '{function_name}' deployed successfully with ID {result.id}")
@@ -317,12 +492,50 @@ def deploy_function_with_sdk(
         
         return hook_dict
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
+        logger.error("Error: %s", e)
         # Print more detailed information for debugging
         import traceback
         traceback.print_exc()
         return None
 
+def deploy_functions_with_sdk(
+    specs: List[Dict[str, Any]],
+    client_factory=None,
+    max_workers: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    Deploy several serverless functions concurrently.
+    
+    Each worker thread gets its own API client, since the SDK's sync client
+    runs its own event loop and cannot be shared between threads.
+    
+    Args:
+        specs: One dict of deploy_function_with_sdk keyword arguments (without client) per function
+        client_factory: Callable returning an authenticated client (default: create_api_client)
+        max_workers: Maximum number of deployments running at the same time
+        
+    Returns:
+        List of {"function_name", "result", "error"} dicts in the order of specs
+    """
+    if client_factory is None:
+        from utils.login import create_api_client
+        client_factory = create_api_client
+    
+    local = threading.local()
+    
+    def deploy_one(spec):
+        try:
+            if not hasattr(local, "client"):
+                local.client = client_factory()
+            result = deploy_function_with_sdk(local.client, **spec)
+            error = None if result is not None else "deployment failed, see log for details"
+        except Exception as e:
+            result, error = None, str(e)
+        return {"function_name": spec.get("function_name"), "result": result, "error": error}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(deploy_one, specs))
+
 def parse_arguments():
     """Parse command line arguments for function deployment.
     
@@ -335,6 +548,7 @@ def parse_arguments():
     source_group = parser.add_mutually_exclusive_group(required=True)
     source_group.add_argument("--file", "-f", dest="file_path", help="Path to the function file")
     source_group.add_argument("--code", "-c", dest="function_code", help="Function code as a string")
+    source_group.add_argument("--file-glob", "-g", help="Glob of function files to deploy concurrently, one hook per file")
     
     # Function configuration
     parser.add_argument("--function-name", "-n", required=True, help="Name of the function")
@@ -342,6 +556,7 @@ def parse_arguments():
     parser.add_argument("--token-owner", "-o", help="User ID or URL to set as token owner")
     parser.add_argument("--events", "-e", help="Comma-separated list of event types (e.g., 'invocation.manual,annotation.status.changed')")
     parser.add_argument("--force-update", "-u", action="store_true", help="Force update even if no code changes are detected")
+    parser.add_argument("--verify", action="store_true", help="Retrieve the hook after deploying to verify it")
     
     # Extra options
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
@@ -350,6 +565,7 @@ def parse_arguments():
     
     # Configure logging level based on verbosity
     if args.verbose:
+        logging.basicConfig(level=logging.INFO, format=VERBOSE_LOG_FORMAT, force=True)
         logger.setLevel(logging.DEBUG)
         logger.debug("Debug logging enabled")
         
@@ -363,17 +579,28 @@ def main():
         
         # Get API client
         logger.info("Getting authenticated API client")
+        from utils.config import API_BASE_URL, ensure_api_v1_url
         from utils.login import get_client
         client = get_client()
+        # Same base URL the client is created with, used to key the deploy cache
+        base_url = ensure_api_v1_url(API_BASE_URL)
         
         if not client:
             logger.error("Failed to get API client")
             return None
             
         # Load function code
-        if args.file_path:
+        if args.file_glob:
+            file_paths = sorted(glob.glob(args.file_glob))
+            if not file_paths:
+                logger.error(f"No files match: {args.file_glob}")
+                return None
+            logger.info(f"Deploying {len(file_paths)} function files matching: {args.file_glob}")
+        elif args.file_path:
             logger.info(f"Loading function code from file: {args.file_path}")
             function_code = read_function_file(args.file_path)
+            if function_code is None:
+                return None
         elif args.function_code:
             logger.info("Using provided function code")
             function_code = args.function_code
@@ -393,6 +620,26 @@ def main():
         if args.events:
             events = [e.strip() for e in args.events.split(",")]
             
+        if args.file_glob:
+            # Deploy every matching file as its own hook
+            specs = [
+                {
+                    "function_code": read_function_file(path),
+                    "function_name": f"{args.function_name} - {Path(path).stem}",
+                    "queue_id": args.queue_id,
+                    "token_owner": token_owner_url,
+                    "events": events,
+                    "force_update": args.force_update,
+                    "verify": args.verify,
+                    "base_url": base_url,
+                }
+                for path in file_paths
+            ]
+            # read_function_file already logged why a file could not be used
+            if any(spec["function_code"] is None for spec in specs):
+                return None
+            return deploy_functions_with_sdk(specs)
+            
         # Deploy the function
         result = deploy_function_with_sdk(
             client,
@@ -402,6 +649,8 @@ def main():
             token_owner_url,
             events,
             args.force_update,
+            args.verify,
+            base_url,
         )        
         return result
     except Exception as e:
@@ -409,6 +658,16 @@ def main():
         return None
 
 if __name__ == "__main__":
+    # Add the src directory to the path to make imports work properly - only needed
+    # when run as a script, library users import this module through src already
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    
+    # Thread/process details are never used in the CLI log formats, so skip collecting
+    # them per record. These flags are process-wide, so library imports leave them alone
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
     try:
         result = main()
     except Exception as e:
@@ -4,18 +4,26 @@ Trigger a webhook test using the Rossum SDK.
 This script sends a test request to a webhook with a simulated annotation event.
 """
 
+import copy
 import json
 import logging
 import os
 import yaml
-import pycurl
-from io import BytesIO
+from collections import OrderedDict
 from utils.login import get_auth_token as get_token
+from utils.session import get_session
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Parsed configs keyed by absolute path, with the (mtime, size) they were parsed at
+_CONFIG_CACHE = OrderedDict()
+_CONFIG_CACHE_SIZE = 100
+
+# Use the libyaml C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 ####### STEP 1: Load YAML Configuration #######
 def load_config(yaml_path):
     """
@@ -32,20 +40,40 @@ def load_config(yaml_path):
     # Create absolute path to config.yml in the same directory
     config_path = os.path.join(script_dir, yaml_path)
     
+    # Reuse the parsed config while the file is unchanged - callers get a copy
+    # so they can't mutate the cached one
+    st = os.stat(config_path)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+        _CONFIG_CACHE.move_to_end(config_path)
+        return copy.deepcopy(cached[2])
+    
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YAML_LOADER)
         logger.info(f"Successfully loaded configuration from {config_path}")
-        return config
+    
+    _CONFIG_CACHE[config_path] = (st.st_mtime, st.st_size, config)
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+        _CONFIG_CACHE.popitem(last=False)
+    
+    return copy.deepcopy(config)
 
 ####### STEP 2: Get Authentication Token #######
-def get_auth_token():
+def get_auth_token(force_refresh=False):
     """
-    Get authentication token from Rossum SDK        
+    Get authentication token from Rossum SDK
+    
+    The SDK client is memoized by utils.login and holds on to its token, so
+    back-to-back calls don't log in again.
+    
+    Args:
+        force_refresh (bool): Log in again for a new token, e.g. after a 401
+        
     Returns:
         str: Authentication token
     """
     logger.info("Getting token from Rossum SDK client")
-    return get_token()
+    return get_token(refresh=force_refresh)
 
 ####### STEP 3: Send Test Request to Rossum API #######
 def send_test_request(hook_id, token, payload, base_url):
@@ -68,29 +96,26 @@ def send_test_request(hook_id, token, payload, base_url):
     test_url = f"{base_url}/hooks/{hook_id}/test"
     logger.info(f"Sending test request to: {test_url}")
     
-    # Send request with PyCurl
-    buffer = BytesIO()
-    c = pycurl.Curl()
-    c.setopt(c.URL, test_url)
-    c.setopt(c.WRITEDATA, buffer)
-    c.setopt(c.HTTPHEADER, [
-        f'Authorization: Token {token}',
-        'Content-Type: application/json'
-    ])
-    c.setopt(c.POST, 1)
-    c.setopt(c.POSTFIELDS, json.dumps(payload))
-    c.setopt(c.VERBOSE, 1)
+    # Serialize the payload once, compactly
+    payload_bytes = json.dumps(payload, separators=(',', ':')).encode('utf-8')
     
+    # Send request over the shared keep-alive session
     logger.info("Sending request...")
-    c.perform()
-    
-    status_code = c.getinfo(c.RESPONSE_CODE)
-    c.close()
+    response = get_session().post(
+        test_url,
+        data=payload_bytes,
+        headers={
+            'Authorization': f'Token {token}',
+            'Content-Type': 'application/json'
+        },
+        timeout=(3.05, 30)
+    )
     
+    status_code = response.status_code
     logger.info(f"Response status code: {status_code}")
     
     # Parse response
-    response_body = buffer.getvalue().decode('utf-8')
+    response_body = response.text
     try:
         response_data = json.loads(response_body) if response_body else {}
         return {
@@ -161,13 +186,24 @@ def test_hook(hook_id, annotation_id="7992402", base_url=None, debug_token=None,
     # 6. Send test request
     result = send_test_request(hook_id, token, payload, base_url)
     
-    # 7. Display results
-    if "response" in result:
-        logger.info("\nResponse:")
-        logger.info(json.dumps(result["response"], indent=2))
-    else:
-        logger.info("\nResponse (non-JSON):")
-        logger.info(result.get("response_text", "No response text"))
+    # A cached token may have been revoked - log in again and retry once
+    if result.get("code") == 401 and not debug_token:
+        logger.info("Token rejected, refreshing and retrying")
+        token = get_auth_token(force_refresh=True)
+        if not token:
+            logger.error("Failed to get authentication token")
+            return None
+        payload["payload"]["rossum_authorization_token"] = token
+        result = send_test_request(hook_id, token, payload, base_url)
+    
+    # 7. Display results - pretty-printing the response is skipped when INFO is filtered out
+    if logger.isEnabledFor(logging.INFO):
+        if "response" in result:
+            logger.info("\nResponse:")
+            logger.info(json.dumps(result["response"], indent=2))
+        else:
+            logger.info("\nResponse (non-JSON):")
+            logger.info(result.get("response_text", "No response text"))
     
     return result
 
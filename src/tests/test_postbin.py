@@ -22,12 +22,15 @@ def post_to_postbin(json_payload, postbin_url, debug=False):
     Returns:
         dict: The response data
     """
+    # One session for the check and the post, so the POST reuses the same connection
+    session = requests.Session()
     try:
         print(f"Posting to URL: {postbin_url}")
         
         # Check if the URL is valid and accessible
         try:
-            check_response = requests.get(postbin_url, timeout=5)
+            # HEAD is enough to spot a 404 without downloading the bin page
+            check_response = session.head(postbin_url, timeout=5, allow_redirects=True)
             if check_response.status_code == 404:
                 print(f"WARNING: The URL {postbin_url} returned a 404 error.")
                 print("This bin may have expired or is invalid.")
@@ -47,25 +50,25 @@ def post_to_postbin(json_payload, postbin_url, debug=False):
             print("Found nested 'payload' key, using the nested content")
             actual_payload = json_payload['payload']
         
-        # Display payload summary
-        print(f"Payload structure: {list(actual_payload.keys())}")
-        
-        if 'annotationId' in actual_payload:
-            print(f"Payload contains 'annotationId': {actual_payload.get('annotationId')}")
-        
-        if 'content' in actual_payload:
-            content_len = len(actual_payload['content'])
-            print(f"Payload contains base64 content of length: {content_len}")
-        
+        # Display payload summary and the full payload only when debugging
         if debug:
+            print(f"Payload structure: {list(actual_payload.keys())}")
+            
+            if 'annotationId' in actual_payload:
+                print(f"Payload contains 'annotationId': {actual_payload.get('annotationId')}")
+            
+            if 'content' in actual_payload:
+                content_len = len(actual_payload['content'])
+                print(f"Payload contains base64 content of length: {content_len}")
+            
             print("\nFull payload:")
             print(json.dumps(actual_payload, indent=2))
         
         # Send the request
         print("\nSending POST request...")
-        response = requests.post(
+        response = session.post(
             postbin_url,
-            json=actual_payload,
+            data=json.dumps(actual_payload, separators=(',', ':')).encode('utf-8'),
             headers={"Content-Type": "application/json"},
             timeout=30
         )
@@ -88,6 +91,8 @@ def post_to_postbin(json_payload, postbin_url, debug=False):
     except Exception as e:
         print(f"Error posting to PostBin: {str(e)}")
         return {"status": "error", "message": str(e)}
+    finally:
+        session.close()
 
 
 def main():
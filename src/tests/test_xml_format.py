@@ -8,7 +8,7 @@ and verifies it matches the expected XML structure.
 import sys
 import json
 import base64
-import xml.dom.minidom
+import xml.etree.ElementTree as ET
 import argparse
 
 # Expected XML structure - the elements and their hierarchy we expect to see
@@ -34,13 +34,20 @@ EXPECTED_XML_ELEMENTS = [
     'InvoiceRegisters/Invoices/Payable/Details/Detail/Notes'
 ]
 
+# Lookup forms of the expected structure: a set for exact matches and a tuple of
+# prefixes that repeated Detail entries may start with (str.startswith takes a tuple)
+EXPECTED_XML_SET = frozenset(EXPECTED_XML_ELEMENTS)
+DETAIL_PREFIXES = tuple(expected + '/Detail' for expected in EXPECTED_XML_ELEMENTS)
+
 def load_payload_json(file_path):
     """
     Load and parse the payload.json file
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        # Hand the raw bytes to the parser - json detects the encoding itself,
+        # so there is no separate text-decoding pass over the file
+        with open(file_path, 'rb') as f:
+            data = json.loads(f.read())
         return data
     except FileNotFoundError:
         print(f"Error: File {file_path} not found")
@@ -60,47 +67,52 @@ def decode_base64_content(payload_data):
     
     try:
         # Get the base64 encoded content
-        base64_content = payload_data['content']
+        base64_content = payload_data['content'].encode('ascii')
         
-        # Decode the base64 content to get the XML
-        xml_content = base64.b64decode(base64_content).decode('utf-8')
+        # Decode the base64 content to get the XML - line-wrapped content is still
+        # valid, so drop ASCII whitespace first and let strict mode reject anything else
+        xml_content = base64.b64decode(b"".join(base64_content.split()), validate=True).decode('utf-8')
         return xml_content
     except Exception as e:
         print(f"Error decoding base64 content: {e}")
         sys.exit(1)
 
-def get_element_structure(dom):
-    """Extract element structure from DOM"""
-    result = []
+def parse_xml(xml_content):
+    """
+    Parse the decoded XML once so every validator can share the tree
+    """
+    try:
+        return ET.fromstring(xml_content)
+    except ET.ParseError as e:
+        print(f"Error parsing XML: {e}")
+        sys.exit(1)
+
+def get_element_structure(root):
+    """Extract the set of element paths from an ElementTree root"""
+    result = set()
     
-    def process_node(node, depth=0, path=""):
-        if node.nodeType == node.ELEMENT_NODE:
-            current_path = f"{path}/{node.nodeName}" if path else node.nodeName
-            result.append(current_path)
-            for child in node.childNodes:
-                process_node(child, depth + 1, current_path)
+    # Walk with an explicit stack of (element, parent path) pairs, adding each
+    # path straight to the set - repeated Detail paths collapse as they're found
+    stack = [(root, "")]
+    while stack:
+        node, path = stack.pop()
+        current_path = f"{path}/{node.tag}" if path else node.tag
+        result.add(current_path)
+        stack.extend((child, current_path) for child in node)
     
-    # Start with the document element
-    process_node(dom.documentElement)
     return result
 
-def validate_xml_structure(xml_content):
+def validate_xml_structure(root):
     """
     Validate XML structure against expected elements
     """
     try:
-        # Parse the XML
-        dom = xml.dom.minidom.parseString(xml_content)
-        
-        # Get the actual element structure
-        actual_elements = get_element_structure(dom)
-        
-        # Convert to sets for comparison
-        actual_set = set(actual_elements)
-        expected_set = set(EXPECTED_XML_ELEMENTS)
+        # Get the actual element structure as a set for comparison
+        actual_set = get_element_structure(root)
+        expected_set = EXPECTED_XML_SET
         
         # Check for missing elements
-        missing = expected_set - actual_set
+        missing = set(expected_set) - actual_set
         if missing:
             print("Missing elements in XML:", missing)
             return False
@@ -110,9 +122,8 @@ def validate_xml_structure(xml_content):
         # as there can be multiple detail elements
         unexpected = set()
         for elem in actual_set:
-            # If element doesn't start with any expected paths
-            if not any(elem == expected or elem.startswith(expected + '/Detail') 
-                       for expected in expected_set):
+            # If element isn't an expected path and doesn't start with any expected Detail path
+            if elem not in expected_set and not elem.startswith(DETAIL_PREFIXES):
                 unexpected.add(elem)
         
         if unexpected:
@@ -124,14 +135,14 @@ def validate_xml_structure(xml_content):
         print(f"Error parsing XML: {e}")
         return False
 
-def validate_currency_uppercase(xml_content):
+def validate_currency_uppercase(root):
     """Check if Currency element contains uppercase value"""
     try:
-        dom = xml.dom.minidom.parseString(xml_content)
-        currency_elements = dom.getElementsByTagName('Currency')
+        # Stop at the first Currency element rather than collecting them all
+        currency_element = next(root.iter('Currency'), None)
         
-        if currency_elements:
-            currency_value = currency_elements[0].firstChild.nodeValue
+        if currency_element is not None:
+            currency_value = currency_element.text
             if currency_value and currency_value.upper() != currency_value:
                 print(f"Warning: Currency value '{currency_value}' is not uppercase")
                 return False
@@ -140,37 +151,34 @@ def validate_currency_uppercase(xml_content):
         print(f"Error checking currency: {e}")
         return False
 
-def validate_xml_indentation(xml_content):
+def validate_xml_indentation(root, lines):
     """Check if XML is properly indented"""
     try:
-        # Parse, then regenerate with pretty printing to check indentation
-        dom = xml.dom.minidom.parseString(xml_content)
-        pretty_xml = dom.toprettyxml(indent="  ")
+        # Count the lines a pretty-printed copy would have straight from the parsed
+        # tree: the declaration, then an open and close line for each element with
+        # children and a single line for each leaf
+        pretty_line_count = 1 + sum(2 if len(elem) else 1 for elem in root.iter())
         
         # Compare structure (ignoring whitespace differences)
-        original_lines = [line.strip() for line in xml_content.splitlines() if line.strip()]
-        pretty_lines = [line.strip() for line in pretty_xml.splitlines() if line.strip()]
+        original_line_count = sum(1 for line in lines if line.strip())
         
         # If the lengths are very different, indentation is likely wrong
-        if abs(len(original_lines) - len(pretty_lines)) > 3:
+        if abs(original_line_count - pretty_line_count) > 3:
             print("Warning: XML doesn't appear to be properly indented")
-            print(f"Original has {len(original_lines)} non-empty lines, properly indented would have {len(pretty_lines)}")
+            print(f"Original has {original_line_count} non-empty lines, properly indented would have {pretty_line_count}")
             return False
         return True
     except Exception as e:
         print(f"Error checking indentation: {e}")
         return False
 
-def print_xml_data(xml_content, max_lines=20):
-    """Print the beginning of the XML content"""
-    lines = xml_content.splitlines()
+def print_xml_data(lines, max_lines=20):
+    """Print the beginning of the XML content, given as a list of lines"""
     print("\n=== XML CONTENT (first few lines) ===")
-    for i, line in enumerate(lines):
-        if i < max_lines:
-            print(line)
-        else:
-            print(f"... (showing {max_lines} of {len(lines)} lines)")
-            break
+    for line in lines[:max_lines]:
+        print(line)
+    if len(lines) > max_lines:
+        print(f"... (showing {max_lines} of {len(lines)} lines)")
 
 def main():
     parser = argparse.ArgumentParser(description='Validate XML from payload.json against expected schema')
@@ -186,19 +194,24 @@ def main():
     print("Extracting and decoding base64 content...")
     xml_content = decode_base64_content(payload_data)
     
+    # Split once - both the preview and the indentation check work on lines
+    lines = xml_content.splitlines()
+    
     if args.show_xml or args.verbose:
-        print_xml_data(xml_content)
+        print_xml_data(lines)
+    
+    root = parse_xml(xml_content)
     
     print("\n=== VALIDATING XML STRUCTURE ===")
-    structure_valid = validate_xml_structure(xml_content)
+    structure_valid = validate_xml_structure(root)
     print(f"XML structure valid: {structure_valid}")
     
     print("\n=== VALIDATING CURRENCY FORMAT ===")
-    currency_valid = validate_currency_uppercase(xml_content)
+    currency_valid = validate_currency_uppercase(root)
     print(f"Currency format valid: {currency_valid}")
     
     print("\n=== VALIDATING XML INDENTATION ===")
-    indentation_valid = validate_xml_indentation(xml_content)
+    indentation_valid = validate_xml_indentation(root, lines)
     print(f"XML indentation valid: {indentation_valid}")
     
     # Overall validation result
@@ -18,14 +18,32 @@ from .config import (
     DEFAULT_TEST_FILE,
     normalize_api_url,
     determine_api_url,
+    ensure_api_v1_url,
     get_auth_header,
     save_auth_token
 )
 
-from .login import (
-    create_api_client,
+from .session import (
+    create_session,
+    get_session,
 )
 
+import importlib
+
+# The login module requires the Rossum SDK, so it is only imported (PEP 562) once
+# create_api_client is used - config and session stay importable without it
+_LAZY_IMPORTS = {
+    'create_api_client': '.login',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 __all__ = [
     # Configuration
     'API_BASE_URL',
@@ -44,7 +62,10 @@ __all__ = [
     # Functions
     'normalize_api_url',
     'determine_api_url',
+    'ensure_api_v1_url',
     'get_auth_header',
     'save_auth_token',
     'create_api_client',
+    'create_session',
+    'get_session',
 ] 
\ No newline at end of file
@@ -4,8 +4,12 @@ Configuration settings for the Rossum serverless function.
 Loads environment variables and provides a central place for configuration.
 """
 
+import functools
+import mmap
 import os
 import re
+import shutil
+import tempfile
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
@@ -38,10 +42,21 @@ DEFAULT_HOOK_ID = os.getenv('DEFAULT_HOOK_ID', '603851')  # Default to the ID fr
 POSTBIN_URL = os.getenv('POSTBIN_URL', '')
 DEFAULT_TEST_FILE = os.getenv('DEFAULT_TEST_FILE', '')
 
+# Matches the token line in the .env file (bytes, so it can scan the mapped file;
+# stops before \r so CRLF line endings are kept)
+_TOKEN_RE = re.compile(rb'^ROSSUM_API_TOKEN=[^\r\n]*', re.MULTILINE)
+
+@functools.lru_cache(maxsize=32)
 def normalize_api_url(url):
     """
     Normalize the API URL to ensure it has the correct format.
     
+    Only rossum.app hosts get /api added; any other host just gets /v1. This is
+    the package-level helper exported from utils (and used by determine_api_url).
+    The login client, get_hook and the deploy cache use ensure_api_v1_url
+    instead, which always adds /api/v1 like their original inline code did, so
+    the two differ for non-rossum.app hosts without /api.
+    
     Args:
         url (str): The URL to normalize
         
@@ -64,6 +79,7 @@ def normalize_api_url(url):
     
     return url
 
+@functools.lru_cache(maxsize=32)
 def determine_api_url(url=None):
     """
     Determine the API URL based on the provided URL or the environment variable.
@@ -81,6 +97,30 @@ def determine_api_url(url=None):
     # Normalize the URL to ensure proper format
     return normalize_api_url(api_url)
 
+@functools.lru_cache(maxsize=8)
+def ensure_api_v1_url(url):
+    """
+    Make sure a base URL points at the /api/v1 root, appending whichever part is missing.
+    
+    Used by create_api_client, get_hook's direct API requests and the deploy cache
+    key. Unlike normalize_api_url it adds /api for every host, not only rossum.app
+    ones, matching the URL handling those callers had before sharing this helper.
+    
+    Args:
+        url (str): The base URL, with or without /api or /api/v1
+        
+    Returns:
+        str: The URL ending in /v1, without a trailing slash
+    """
+    url = url.rstrip("/")
+    
+    if not url.endswith("/v1"):
+        if url.endswith("/api"):
+            url = f"{url}/v1"
+        else:
+            url = f"{url}/api/v1"
+    
+    return url
 
 def get_auth_header(token=None):
     """
@@ -108,24 +148,45 @@ def save_auth_token(token):
     Returns:
         bool: True if successful, False otherwise
     """
+    token_line = f'ROSSUM_API_TOKEN="{token}"'.encode()
+    
     try:
-        # Read the contents of the .env file
-        with open(ENV_PATH, 'r') as f:
-            content = f.read()
-            
-        # Check if the token already exists in the file
-        token_pattern = re.compile(r'^ROSSUM_API_TOKEN=.*$', re.MULTILINE)
+        matches = []
+        content = b''
+        
+        with open(ENV_PATH, 'r+b') as f:
+            # mmap can't map an empty file
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0) as mm:
+                    matches = list(_TOKEN_RE.finditer(mm))
+                    
+                    # A refreshed token is normally the same length as the old one,
+                    # so overwrite that line in place instead of rewriting the file
+                    if len(matches) == 1 and matches[0].end() - matches[0].start() == len(token_line):
+                        mm[matches[0].start():matches[0].end()] = token_line
+                        mm.flush()
+                        logger.info("Token saved to .env file")
+                        return True
+                    
+                    content = mm[:]
         
-        if token_pattern.search(content):
+        if matches:
             # Replace the existing token
-            content = token_pattern.sub(f'ROSSUM_API_TOKEN="{token}"', content)
+            content = _TOKEN_RE.sub(lambda m: token_line, content)
         else:
             # Add the token at the beginning of the file
-            content = f'ROSSUM_API_TOKEN="{token}"\n{content}'
+            content = token_line + b'\n' + content
             
-        # Write the updated content back to the file
-        with open(ENV_PATH, 'w') as f:
-            f.write(content)
+        # Write the updated content to a temp file next to .env and swap it in atomically
+        fd, tmp_path = tempfile.mkstemp(dir=ENV_PATH.parent, prefix='.env.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(content)
+            shutil.copymode(ENV_PATH, tmp_path)
+            os.replace(tmp_path, ENV_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
             
         logger.info("Token saved to .env file")
         return True
@@ -6,25 +6,29 @@ and analyze/fix event subscription issues.
 """
 
 import argparse
+import functools
 import json
 import logging
 import os
 import sys
-import requests
+import time
+from dataclasses import asdict, is_dataclass
 from typing import Dict, Any, Optional, List
+from urllib.parse import urlsplit
 
 # Add the src directory to the path to make imports work properly
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from utils.config import API_TOKEN, API_BASE_URL
+from utils.config import API_TOKEN, API_BASE_URL, ensure_api_v1_url
 from utils.login import get_client
+from utils.session import get_session
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Standard event types that can be used with hooks
-STANDARD_EVENT_TYPES = [
+# Standard event types that can be used with hooks (a frozenset - only used for membership checks)
+STANDARD_EVENT_TYPES = frozenset([
     "annotation.created", 
     "annotation.updated",
     "document.created", 
@@ -39,7 +43,53 @@ STANDARD_EVENT_TYPES = [
     "user.updated",
     "workspace.created", 
     "workspace.updated"
-]
+])
+
+# Events --fix-invocation makes sure a hook is subscribed to, in the order they're added
+INVOCATION_EVENTS = ("invocation", "invocation.manual")
+
+# Recently fetched hook details keyed by (hook_id, token, base_url), as (fetched_at, details)
+_HOOK_CACHE: Dict[tuple, tuple] = {}
+_HOOK_CACHE_TTL = 30
+
+def _invalidate_hook_cache(hook_id: str) -> None:
+    """Drop cached details for a hook, whichever token/base URL fetched them."""
+    for key in [key for key in _HOOK_CACHE if key[0] == str(hook_id)]:
+        del _HOOK_CACHE[key]
+
+@functools.lru_cache(maxsize=32)
+def _public_attr_names(cls: type) -> tuple:
+    """Public attribute names of a class, looked up once per type."""
+    return tuple(attr for attr in dir(cls) if not attr.startswith('_'))
+
+def _to_dict(obj: Any) -> Dict[str, Any]:
+    """
+    Convert an SDK model (or a plain dict) to a dictionary of its public fields.
+    
+    Args:
+        obj: Object returned by the SDK client
+        
+    Returns:
+        Dictionary of the object's public, non-callable attributes
+    """
+    if isinstance(obj, dict):
+        return obj
+    
+    # SDK models are dataclasses
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    
+    attrs = getattr(obj, '__dict__', None)
+    if attrs is not None:
+        return {k: v for k, v in attrs.items() if not k.startswith('_')}
+    
+    # Last resort for objects without __dict__ (e.g. __slots__ classes)
+    result = {}
+    for attr in _public_attr_names(type(obj)):
+        value = getattr(obj, attr, None)
+        if not callable(value):
+            result[attr] = value
+    return result
 
 def get_hook_details(hook_id: str, token: Optional[str] = None, base_url: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -61,6 +111,13 @@ def get_hook_details(hook_id: str, token: Optional[str] = None, base_url: Option
         logger.error("API token is required. Provide it as an argument or set it in the .env file.")
         sys.exit(1)
     
+    # Reuse details fetched moments ago (e.g. main() followed by update_hook_events)
+    cache_key = (str(hook_id), token, base_url)
+    cached = _HOOK_CACHE.get(cache_key)
+    if cached and time.monotonic() - cached[0] < _HOOK_CACHE_TTL:
+        logger.info(f"Using cached details for hook {hook_id}")
+        return cached[1]
+    
     logger.info(f"Retrieving details for hook {hook_id}")
     
     try:
@@ -72,48 +129,25 @@ def get_hook_details(hook_id: str, token: Optional[str] = None, base_url: Option
             hook = client.retrieve_hook(hook_id)
             
             # Convert to dictionary if it's an object
-            if not isinstance(hook, dict):
-                # Try to convert to dict using __dict__ attribute
-                if hasattr(hook, '__dict__'):
-                    hook_dict = {k: v for k, v in hook.__dict__.items() if not k.startswith('_')}
-                else:
-                    # Fallback method
-                    hook_dict = {}
-                    for attr in dir(hook):
-                        if not attr.startswith('_') and not callable(getattr(hook, attr)):
-                            hook_dict[attr] = getattr(hook, attr)
-            else:
-                hook_dict = hook
+            hook_dict = _to_dict(hook)
             
             logger.info(f"Successfully retrieved hook {hook_id}")
+            _HOOK_CACHE[cache_key] = (time.monotonic(), hook_dict)
             return hook_dict
         
         # Fallback to direct API request
         logger.info("Falling back to direct API request")
         
-        # Format the API URL
-        api_url = base_url.rstrip("/")
-        if not api_url.endswith("/v1"):
-            if api_url.endswith("/api"):
-                api_url = f"{api_url}/v1"
-            elif not api_url.endswith("/api/v1"):
-                api_url = f"{api_url}/api/v1"
-        
-        hook_url = f"{api_url}/hooks/{hook_id}"
+        hook_url = f"{ensure_api_v1_url(base_url)}/hooks/{hook_id}"
         
-        # Create headers for the request
-        headers = {
-            "Authorization": f"Token {token}",
-            "Content-Type": "application/json"
-        }
-        
-        # Make the request
-        response = requests.get(hook_url, headers=headers)
+        # Make the request over the shared keep-alive session, which carries the auth headers
+        response = get_session(token).get(hook_url, timeout=30)
         response.raise_for_status()
         
         hook_data = response.json()
         logger.info(f"Successfully retrieved hook {hook_id}")
         
+        _HOOK_CACHE[cache_key] = (time.monotonic(), hook_data)
         return hook_data
         
     except Exception as e:
@@ -157,18 +191,10 @@ def update_hook_events(hook_id: str, events: List[str], token: Optional[str] = N
         if hasattr(client, "update_part_hook") and callable(client.update_part_hook):
             logger.info("Using SDK client to update hook")
             result = client.update_part_hook(hook_id, data=update_data)
+            _invalidate_hook_cache(hook_id)
             
             # Convert result to dict if needed
-            if not isinstance(result, dict):
-                if hasattr(result, '__dict__'):
-                    result_dict = {k: v for k, v in result.__dict__.items() if not k.startswith('_')}
-                else:
-                    result_dict = {}
-                    for attr in dir(result):
-                        if not attr.startswith('_') and not callable(getattr(result, attr)):
-                            result_dict[attr] = getattr(result, attr)
-            else:
-                result_dict = result
+            result_dict = _to_dict(result)
                 
             logger.info("Successfully updated hook events")
             return result_dict
@@ -176,25 +202,12 @@ def update_hook_events(hook_id: str, events: List[str], token: Optional[str] = N
         # Fallback to direct API request
         logger.info("Falling back to direct API request for update")
         
-        # Format the API URL
-        api_url = base_url.rstrip("/")
-        if not api_url.endswith("/v1"):
-            if api_url.endswith("/api"):
-                api_url = f"{api_url}/v1"
-            elif not api_url.endswith("/api/v1"):
-                api_url = f"{api_url}/api/v1"
+        hook_url = f"{ensure_api_v1_url(base_url)}/hooks/{hook_id}"
         
-        hook_url = f"{api_url}/hooks/{hook_id}"
-        
-        # Create headers for the request
-        headers = {
-            "Authorization": f"Token {token}",
-            "Content-Type": "application/json"
-        }
-        
-        # Make the PATCH request
-        response = requests.patch(hook_url, headers=headers, json=update_data)
+        # Make the PATCH request over the shared keep-alive session
+        response = get_session(token).patch(hook_url, json=update_data, timeout=30)
         response.raise_for_status()
+        _invalidate_hook_cache(hook_id)
         
         updated_hook = response.json()
         logger.info("Successfully updated hook events via API")
@@ -247,20 +260,21 @@ def check_event_support(hook_data: Dict[str, Any], event: str) -> bool:
     if "events" not in hook_data:
         return False
         
-    events = hook_data["events"]
+    event_set = frozenset(hook_data["events"])
     
     # Check if the exact event is in the list
-    if event in events:
+    if event in event_set:
         return True
         
     # Check for parent events (e.g., "invocation" for "invocation.manual")
     if '.' in event:
         parent_event = event.split('.')[0]
-        if parent_event in events:
+        if parent_event in event_set:
             return True
             
     return False
 
+@functools.lru_cache(maxsize=256)
 def validate_event_format(event: str) -> bool:
     """
     Validate that an event string is properly formatted.
@@ -301,30 +315,33 @@ def suggest_event_fixes(hook_data: Dict[str, Any], desired_event: str) -> List[s
         return ["Add events list to hook configuration"]
         
     events = hook_data["events"]
+    event_set = frozenset(events)
     
     suggestions = []
     
     # If the hook doesn't have any events, suggest adding the desired event
-    if not events:
+    if not event_set:
         suggestions.append(f"Add '{desired_event}' to the events list")
         return suggestions
         
     # If the desired event is already in the list, no need to fix
-    if desired_event in events:
+    if desired_event in event_set:
         suggestions.append("No fixes needed, event is already supported")
         return suggestions
         
     # Check if there's a parent/child relationship
     if '.' in desired_event:
         parent_event = desired_event.split('.')[0]
-        if parent_event in events:
+        if parent_event in event_set:
             suggestions.append(f"Use parent event '{parent_event}' instead of '{desired_event}'")
             suggestions.append(f"Or add '{desired_event}' to the events list")
         else:
             suggestions.append(f"Add '{desired_event}' to the events list")
     else:
         # If we're trying to use a parent event like "invocation" but hook has "invocation.manual"
-        child_events = [e for e in events if e.startswith(f"{desired_event}.")]
+        # (scans the list rather than the set so suggestions keep the hook's event order)
+        child_prefix = f"{desired_event}."
+        child_events = [e for e in events if e.startswith(child_prefix)]
         if child_events:
             suggestions.append(f"Use specific event(s) {', '.join(child_events)} instead of generic '{desired_event}'")
             suggestions.append(f"Or add '{desired_event}' to the events list")
@@ -376,16 +393,14 @@ def main():
     # Handle fix-invocation request
     if args.fix_invocation:
         current_events = hook_data.get("events", [])
-        new_events = list(current_events)  # Make a copy
+        current_set = frozenset(current_events)
         
-        # Add invocation events if not present
-        if "invocation" not in new_events:
-            new_events.append("invocation")
-        if "invocation.manual" not in new_events:
-            new_events.append("invocation.manual")
+        # Invocation events that aren't present yet
+        missing_events = [event for event in INVOCATION_EVENTS if event not in current_set]
         
-        # Update the hook if changes were made
-        if set(new_events) != set(current_events):
+        # Update the hook only if something is missing - the new list is built just then
+        if missing_events:
+            new_events = list(current_events) + missing_events
             print(f"Updating hook events from {current_events} to {new_events}")
             updated_hook = update_hook_events(args.hook_id, new_events, args.token, args.base_url)
             
@@ -402,10 +417,10 @@ def main():
     elif args.update_events:
         new_events = args.update_events
         
-        # Validate event formats
-        for event in new_events:
-            if not validate_event_format(event):
-                print(f"Warning: '{event}' may not be a valid event format")
+        # Validate event formats in one pass and warn about all invalid ones together
+        invalid_events = [event for event in new_events if not validate_event_format(event)]
+        if invalid_events:
+            print(f"Warning: {', '.join(repr(e) for e in invalid_events)} may not be valid event formats")
         
         print(f"Updating hook events to: {new_events}")
         updated_hook = update_hook_events(args.hook_id, new_events, args.token, args.base_url)
@@ -454,7 +469,8 @@ def main():
     
     # Otherwise, output full details
     if args.format == "json":
-        # Pretty print the JSON
+        # Pretty print the JSON - serialized in full first, so a failure can never
+        # leave half a document on stdout for whatever is parsing it
         print(json.dumps(hook_data, indent=2))
     else:
         # Text format
@@ -506,15 +522,18 @@ def main():
             if field in hook_data:
                 if isinstance(hook_data[field], (dict, list)):
                     print(f"\n{field.capitalize()}:")
-                    print(json.dumps(hook_data[field], indent=2))
+                    # Streamed to stdout - this is human-readable output, so a field that
+                    # fails to serialize may leave a partial dump before the error
+                    json.dump(hook_data[field], sys.stdout, indent=2)
+                    sys.stdout.write("\n")
                 else:
                     print(f"{field.capitalize()}: {hook_data[field]}")
         
         # Provide a recommendation for deploy_with_sdk.py
         if user_id:
-            base_url = args.base_url.rstrip("/").replace("/api/v1", "")
+            parts = urlsplit(args.base_url)
             print("\nRecommended token_owner setting for deploy_with_sdk.py:")
-            print(f"token_owner: {base_url}/api/v1/users/{user_id}")
+            print(f"token_owner: {parts.scheme}://{parts.netloc}/api/v1/users/{user_id}")
         else:
             print("\nCould not determine user ID for token_owner setting")
             
@@ -7,99 +7,107 @@ import argparse
 import logging
 
 # Local imports
-from utils.config import API_BASE_URL, EMAIL, PASSWORD, save_auth_token
+from utils.config import API_BASE_URL, EMAIL, PASSWORD, ensure_api_v1_url, save_auth_token
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Global client instance for reuse
-_api_client = None
+try:
+    from rossum_api import ElisAPIClientSync
+except ImportError:
+    logger.error("rossum_api is not installed - run `rye sync` (or `pip install -r requirements.lock`) to install the project dependencies")
+    raise
 
-def create_api_client(username=None, password=None, base_url=None):
+__all__ = ["create_api_client", "get_client", "get_auth_token"]
+
+# Authenticated client instances for reuse, keyed by the credentials they were created with
+_api_clients = {}
+
+def create_api_client(username=None, password=None, base_url=None, token=None):
     """
     Create and authenticate an ElisAPIClientSync client.
     
     If username, password, or base_url are None, they will be loaded from config.
+    When a token is given the client uses it directly instead of logging in.
     
     Args:
         username (str, optional): The username (email) to use for authentication
         password (str, optional): The password to use for authentication
         base_url (str, optional): The base URL of the Rossum API
+        token (str, optional): An existing API token to authenticate with
         
     Returns:
         ElisAPIClientSync: The authenticated API client
     """
     try:
-        from rossum_api import ElisAPIClientSync
-        
         # Use provided values or fall back to config
         _username = username if username is not None else EMAIL
         _password = password if password is not None else PASSWORD
-        _base_url = base_url if base_url is not None else API_BASE_URL
-        
-        # Make sure we don't have double slashes in the URL
-        _base_url = _base_url.rstrip("/")
+        _base_url = ensure_api_v1_url(base_url if base_url is not None else API_BASE_URL)
         
-        # Ensure base_url ends with /v1
-        if not _base_url.endswith('/v1'):
-            if _base_url.endswith('/api'):
-                _base_url += '/v1'
-            else:
-                _base_url += '/api/v1'
-                
         logger.info(f"Creating API client with base URL: {_base_url}")
         
-        # Create API client
-        client = ElisAPIClientSync(
-            base_url=_base_url,
-            username=_username,
-            password=_password,
-        )
+        # Create API client - the SDK keeps a pooled HTTP client per instance,
+        # so callers should reuse one instance via get_client()
+        if token:
+            client = ElisAPIClientSync(base_url=_base_url, token=token)
+        else:
+            client = ElisAPIClientSync(
+                base_url=_base_url,
+                username=_username,
+                password=_password,
+            )
         
         return client
         
-    except ImportError as e:
-        logger.error(f"Failed to import ElisAPIClientSync: {str(e)}")
-        logger.info("Trying to install rossum_api package...")
-        import subprocess
-        subprocess.check_call(["pip", "install", "rossum_api"])
-        from rossum_api import ElisAPIClientSync
-        logger.info("Successfully installed rossum_api package")
-        
-        # Retry creating the client after installing the package
-        return create_api_client(username, password, base_url)
-        
     except Exception as e:
         logger.error(f"Error creating API client: {str(e)}")
         raise
 
-def get_client():
+def get_client(username=None, password=None, base_url=None, token=None):
     """
     Get a reusable authenticated API client instance.
     
-    This function reuses the same client instance if possible.
+    This function reuses the same client instance for the same credentials,
+    so repeated calls don't log in again.
     
+    Args:
+        username (str, optional): The username (email) to use for authentication
+        password (str, optional): The password to use for authentication
+        base_url (str, optional): The base URL of the Rossum API
+        token (str, optional): An existing API token to authenticate with
+        
     Returns:
         ElisAPIClientSync: The authenticated API client
     """
-    global _api_client
+    # Resolve the config defaults first so explicit and implicit credentials share a client
+    key = (
+        username if username is not None else EMAIL,
+        password if password is not None else PASSWORD,
+        base_url if base_url is not None else API_BASE_URL,
+        token,
+    )
     
-    if _api_client is None:
-        _api_client = create_api_client()
+    client = _api_clients.get(key)
+    if client is None:
+        client = _api_clients[key] = create_api_client(*key)
         
-    return _api_client
+    return client
 
-def get_auth_token():
+def get_auth_token(refresh=False):
     """
     Get authentication token from Rossum API.
     
+    Args:
+        refresh (bool): Have the client log in again instead of returning the token it holds
+        
     Returns:
         str: Authentication token
     """
     logger.info("Getting token from Rossum SDK client")
     client = get_client()
-    token = client.get_token()
+    token = client.get_token(refresh=refresh)
     return token
 
 def main():
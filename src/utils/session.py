@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP session for raw Rossum API calls.
+Keeps TCP/TLS connections alive between requests and retries transient gateway errors.
+"""
+
+import atexit
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Module-level session reused by every caller in the process
+_session = None
+
+# Token currently set in the session's Authorization header
+_session_token = None
+
+def create_session(pool_connections=10, pool_maxsize=20):
+    """
+    Create a requests session with connection pooling and retry/backoff.
+
+    Args:
+        pool_connections (int): Number of host pools to cache
+        pool_maxsize (int): Maximum number of connections kept per host
+
+    Returns:
+        requests.Session: The configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+def get_session(token=None):
+    """
+    Get the shared pooled session, optionally setting the authorization header.
+
+    Args:
+        token (str, optional): API token to send in the Authorization header
+
+    Returns:
+        requests.Session: The shared session
+    """
+    global _session, _session_token
+
+    if _session is None:
+        _session = create_session()
+        atexit.register(_session.close)
+
+    # Only touch the headers when the token actually changes
+    if token and token != _session_token:
+        _session.headers["Authorization"] = f"Token {token}"
+        _session_token = token
+
+    return _session